@@ -4,11 +4,14 @@ Flask 기반 API 서버
 """
 
 import os
-from flask import Flask, render_template, request, jsonify
+import time
+from flask import Flask, render_template, request, jsonify, g
 from dotenv import load_dotenv
 
 from services.aladin_service import AladinService, CATEGORY_MAP
 from services.gemini_service import ChatGPTService
+from services.query_service import search_books_for_question, normalize_query, MOOD_KEYWORDS
+from services.query_log import QueryLog, PrefetchScheduler
 
 # 환경변수 로드
 load_dotenv()
@@ -19,6 +22,9 @@ app.config['JSON_AS_ASCII'] = False
 # 서비스 인스턴스 (지연 초기화)
 _aladin_service = None
 _chatgpt_service = None
+_query_log = None
+_query_log_failed = False
+_prefetch_scheduler = None
 
 
 def get_aladin_service():
@@ -29,9 +35,32 @@ def get_aladin_service():
             _aladin_service = AladinService()
         except ValueError as e:
             return None
+        start_prefetch_scheduler(_aladin_service)
     return _aladin_service
 
 
+def get_query_log():
+    """검색 기록 저장소 인스턴스 반환 (생성에 실패하면 다시 시도하지 않음)"""
+    global _query_log, _query_log_failed
+    if _query_log is None and not _query_log_failed:
+        try:
+            _query_log = QueryLog()
+        except Exception as e:
+            _query_log_failed = True
+    return _query_log
+
+
+def start_prefetch_scheduler(aladin):
+    """검색 기록 기반 선행 조회 스케줄러 시작 (PREFETCH_ENABLED=0이면 비활성화)"""
+    global _prefetch_scheduler
+    if _prefetch_scheduler is not None or os.getenv('PREFETCH_ENABLED', '1') == '0':
+        return
+    query_log = get_query_log()
+    if query_log:
+        _prefetch_scheduler = PrefetchScheduler(aladin, query_log)
+        _prefetch_scheduler.start()
+
+
 def get_chatgpt_service():
     """ChatGPT 서비스 인스턴스 반환"""
     global _chatgpt_service
@@ -43,6 +72,37 @@ def get_chatgpt_service():
     return _chatgpt_service
 
 
+@app.before_request
+def start_timer():
+    """요청 처리 시간 측정 시작"""
+    g.request_start = time.perf_counter()
+
+
+def remember_query(query, category='전체', max_results=10, query_type='Keyword'):
+    """검색 기록에 남길 요청 정보 저장 (선행 조회 때 같은 파라미터로 다시 호출)"""
+    g.logged_query = {
+        "query": query,
+        "category": category,
+        "max_results": max_results,
+        "query_type": query_type
+    }
+
+
+@app.after_request
+def log_query(response):
+    """검색 관련 요청을 검색 기록에 추가 (저장은 백그라운드에서 처리)"""
+    entry = g.get('logged_query')
+    if entry is None or response.status_code != 200 or 'request_start' not in g:
+        return response
+    query_log = get_query_log()
+    if not query_log:
+        return response
+    
+    latency_ms = (time.perf_counter() - g.request_start) * 1000
+    query_log.record(request.path, latency_ms=latency_ms, **entry)
+    return response
+
+
 @app.route('/')
 def index():
     """메인 페이지"""
@@ -56,13 +116,14 @@ def search_books():
     if not aladin:
         return jsonify({"error": "알라딘 API 키가 설정되지 않았습니다."}), 500
     
-    query = request.args.get('query', '')
+    query = normalize_query(request.args.get('query', ''))
     query_type = request.args.get('type', 'Keyword')
     max_results = int(request.args.get('limit', 10))
     
     if not query:
         return jsonify({"error": "검색어를 입력해주세요."}), 400
     
+    remember_query(query, max_results=max_results, query_type=query_type)
     result = aladin.search_books(query, query_type, max_results)
     return jsonify(result)
 
@@ -78,6 +139,7 @@ def get_bestsellers():
     category_id = CATEGORY_MAP.get(category, 0)
     max_results = int(request.args.get('limit', 10))
     
+    remember_query('', category, max_results)
     result = aladin.get_bestsellers(category_id, max_results)
     return jsonify(result)
 
@@ -93,6 +155,7 @@ def get_new_releases():
     category_id = CATEGORY_MAP.get(category, 0)
     max_results = int(request.args.get('limit', 10))
     
+    remember_query('', category, max_results)
     result = aladin.get_new_releases(category_id, max_results)
     return jsonify(result)
 
@@ -110,10 +173,10 @@ def get_recommendations():
     
     data = request.get_json()
     
-    interests = data.get('interests', '')
+    interests = normalize_query(data.get('interests', ''))
     mood = data.get('mood', '')
     purpose = data.get('purpose', '')
-    department = data.get('department', '')
+    department = normalize_query(data.get('department', ''))
     category = data.get('category', '전체')
     
     if not interests and not department:
@@ -124,6 +187,7 @@ def get_recommendations():
     
     # 관심사 기반으로 도서 검색
     category_id = CATEGORY_MAP.get(category, 0)
+    remember_query(search_query, category, 20)
     search_result = aladin.search_books(search_query, "Keyword", 20, category_id=category_id)
     
     books = search_result.get('item', [])
@@ -165,22 +229,14 @@ def get_mood_recommendations():
         return jsonify({"error": "OpenAI API 키가 설정되지 않았습니다."}), 500
     
     data = request.get_json()
-    mood = data.get('mood', '')
+    mood = normalize_query(data.get('mood', ''))
     
     if not mood:
         return jsonify({"error": "기분을 선택해주세요."}), 400
+    remember_query(mood, max_results=15)
     
     # 기분에 맞는 키워드로 도서 검색
-    mood_keywords = {
-        "힐링": "에세이 위로",
-        "설렘": "도전 성공",
-        "우울": "희망 치유",
-        "호기심": "과학 철학",
-        "지침": "여행 휴식",
-        "성장": "자기계발 성장"
-    }
-    
-    search_keyword = mood_keywords.get(mood, mood)
+    search_keyword = MOOD_KEYWORDS.get(mood, mood)
     search_result = aladin.search_books(search_keyword, "Keyword", 15)
     books = search_result.get('item', [])
     
@@ -216,19 +272,14 @@ def chat_recommendation():
         return jsonify({"error": "OpenAI API 키가 설정되지 않았습니다."}), 500
     
     data = request.get_json()
-    query = data.get('query', '')
+    query = normalize_query(data.get('query', ''))
     
     if not query:
         return jsonify({"error": "질문을 입력해주세요."}), 400
+    remember_query(query, max_results=15)
     
-    # 질문에서 키워드 추출하여 도서 검색
-    search_result = aladin.search_books(query, "Keyword", 15)
-    books = search_result.get('item', [])
-    
-    if not books:
-        # 베스트셀러로 대체
-        bestseller_result = aladin.get_bestsellers(max_results=15)
-        books = bestseller_result.get('item', [])
+    # 질문에서 키워드를 추출하여 도서 검색 (결과가 없으면 베스트셀러로 대체)
+    books = search_books_for_question(aladin, query, 15)
     
     recommendation = chatgpt.get_custom_recommendation(query, books)
     
@@ -245,6 +296,30 @@ def chat_recommendation():
     return jsonify(recommendation)
 
 
+@app.route('/api/stats/cache', methods=['GET'])
+def get_cache_stats():
+    """알라딘 캐시 적중률 및 선행 조회 효과 API"""
+    aladin = get_aladin_service()
+    if not aladin:
+        return jsonify({"error": "알라딘 API 키가 설정되지 않았습니다."}), 500
+    
+    stats = aladin.cache_stats()
+    if _prefetch_scheduler:
+        stats["predicted_peaks"] = _prefetch_scheduler.predicted_peaks()
+        stats["last_prefetch"] = _prefetch_scheduler.last_run
+    return jsonify(stats)
+
+
+@app.route('/api/stats/keys', methods=['GET'])
+def get_key_stats():
+    """알라딘 API 키별 사용량 및 남은 호출 한도 API"""
+    aladin = get_aladin_service()
+    if not aladin:
+        return jsonify({"error": "알라딘 API 키가 설정되지 않았습니다."}), 500
+    
+    return jsonify(aladin.key_stats())
+
+
 @app.route('/api/categories', methods=['GET'])
 def get_categories():
     """카테고리 목록 API"""
@@ -257,7 +332,7 @@ if __name__ == '__main__':
     print("=" * 50)
     print("\n서버 시작: http://localhost:5001")
     print("\n⚠️  .env 파일에 API 키를 설정해주세요:")
-    print("   - ALADIN_API_KEY: 알라딘 TTB 키")
+    print("   - ALADIN_API_KEY: 알라딘 TTB 키 (여러 개는 ALADIN_API_KEYS에 쉼표로 구분)")
     print("   - OPENAI_API_KEY: OpenAI API 키\n")
     
     app.run(debug=True, host='0.0.0.0', port=5001)
@@ -0,0 +1,261 @@
+"""
+알라딘 API 키 풀
+여러 TTB 키의 일일 호출량을 SQLite에 기록하고, 남은 호출 한도에 맞춰 키를 분배하는 기능 제공
+"""
+
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+# 알라딘 일일 호출 한도는 한국 시간 자정에 초기화됨 (서버 시간대와 무관하게 계산)
+KST = timezone(timedelta(hours=9), "KST")
+
+
+class AladinKeyPool:
+    """일일 호출 한도를 고려해 알라딘 TTB 키를 분배하는 키 풀"""
+
+    # 호출량 저장 간격 (초) - 요청 처리 중에는 메모리에만 더하고 백그라운드에서 모아서 저장
+    PERSIST_INTERVAL = 5
+    # 일시적 호출 제한(HTTP 429)을 받은 키를 제외하는 시간 (초)
+    THROTTLE_SIDELINE_SECONDS = 60
+
+    def __init__(self, api_keys: list, daily_budget: Optional[int] = None,
+                 db_path: Optional[str] = None):
+        keys = [key.strip() for key in api_keys if key and key.strip()]
+        if not keys:
+            raise ValueError("알라딘 API 키가 설정되지 않았습니다.")
+
+        self._keys = {self._key_id(key): key for key in keys}
+        self._daily_budget = daily_budget or int(os.getenv("ALADIN_DAILY_BUDGET", 5000))
+        self._db_path = db_path or os.getenv("ALADIN_KEY_USAGE_PATH", "aladin_key_usage.db")
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._day = self._today()
+        # 키별 오늘 사용량 (저장소의 전체 프로세스 합계 + 아직 저장하지 않은 이 프로세스 사용량)
+        self._usage = self._empty_usage()
+        # 아직 저장하지 않은 사용량: (키 ID, 날짜) -> 증가분
+        self._pending = {}
+
+        try:
+            self._init_db()
+        except sqlite3.Error:
+            # 저장소를 쓸 수 없으면 이 프로세스 안에서만 집계
+            self._db_path = None
+
+        if self._db_path:
+            self.flush()
+            threading.Thread(target=self._flush_loop, daemon=True).start()
+            atexit.register(self.flush)
+
+    @property
+    def persisted(self) -> bool:
+        """사용량을 SQLite에 저장하는지 여부"""
+        return self._db_path is not None
+
+    def acquire(self, exclude=()) -> Optional[tuple]:
+        """
+        남은 호출 한도가 가장 많은 키를 골라 호출 1회를 예약
+
+        Args:
+            exclude: 이번 요청에서 이미 실패한 키 ID 목록
+
+        Returns:
+            (키 ID, API 키) 또는 사용 가능한 키가 없으면 None
+        """
+        now = time.time()
+        with self._lock:
+            self._roll_day()
+            candidates = [
+                (self._daily_budget - usage["calls"], key_id)
+                for key_id, usage in self._usage.items()
+                if key_id not in exclude
+                and usage["sidelined_until"] <= now
+                and usage["calls"] < self._daily_budget
+            ]
+            if not candidates:
+                return None
+
+            _, key_id = max(candidates)
+            self._usage[key_id]["calls"] += 1
+            self._pending_for(key_id)["calls"] += 1
+        return key_id, self._keys[key_id]
+
+    def report_error(self, key_id: str, quota_exceeded: bool = False):
+        """
+        키 때문에 실패한 호출 기록
+
+        일일 한도 초과 오류면 다음 한도 초기화 시각까지,
+        일시적 호출 제한이면 THROTTLE_SIDELINE_SECONDS 동안 키를 제외
+
+        Args:
+            key_id: 키 ID
+            quota_exceeded: 일일 호출 한도 초과 오류 여부 (False면 일시적 호출 제한)
+        """
+        with self._lock:
+            self._roll_day()
+            usage = self._usage[key_id]
+            pending = self._pending_for(key_id)
+            usage["errors"] += 1
+            pending["errors"] += 1
+
+            if quota_exceeded:
+                usage["quota_errors"] += 1
+                pending["quota_errors"] += 1
+                sidelined_until = self._next_reset()
+            else:
+                sidelined_until = time.time() + self.THROTTLE_SIDELINE_SECONDS
+
+            if sidelined_until > usage["sidelined_until"]:
+                usage["sidelined_until"] = sidelined_until
+                pending["sidelined_until"] = max(pending["sidelined_until"], sidelined_until)
+                # 다른 프로세스도 빨리 알 수 있도록 바로 저장
+                self._wake.set()
+
+    def stats(self) -> list:
+        """
+        키별 사용량 및 남은 호출 한도
+
+        Returns:
+            {key_id, calls, errors, quota_errors, error_rate, remaining, sidelined} 목록
+        """
+        now = time.time()
+        with self._lock:
+            self._roll_day()
+            return [
+                {
+                    "key_id": key_id,
+                    "calls": usage["calls"],
+                    "errors": usage["errors"],
+                    "quota_errors": usage["quota_errors"],
+                    "error_rate": round(usage["errors"] / usage["calls"], 4) if usage["calls"] else 0.0,
+                    "remaining": max(self._daily_budget - usage["calls"], 0),
+                    "sidelined": usage["sidelined_until"] > now
+                }
+                for key_id, usage in self._usage.items()
+            ]
+
+    def flush(self):
+        """
+        아직 저장하지 않은 사용량을 저장소에 더하고, 다른 프로세스 사용량을 포함한 합계를 다시 읽음
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                day = self._day
+            if not self._db_path:
+                return
+
+            try:
+                with self._connect() as conn:
+                    conn.executemany("""
+                        INSERT INTO key_usage VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (key_id, day) DO UPDATE SET
+                            calls = calls + excluded.calls,
+                            errors = errors + excluded.errors,
+                            quota_errors = quota_errors + excluded.quota_errors,
+                            sidelined_until = MAX(sidelined_until, excluded.sidelined_until)
+                    """, [
+                        (key_id, pending_day, delta["calls"], delta["errors"],
+                         delta["quota_errors"], delta["sidelined_until"])
+                        for (key_id, pending_day), delta in pending.items()
+                    ])
+                    rows = conn.execute(
+                        "SELECT key_id, calls, errors, quota_errors, sidelined_until "
+                        "FROM key_usage WHERE day = ?",
+                        (day,)
+                    ).fetchall()
+            except sqlite3.Error:
+                # 저장에 실패한 증가분은 다음 저장 때 다시 시도
+                with self._lock:
+                    for slot, delta in pending.items():
+                        self._merge(self._pending.setdefault(slot, self._empty_delta()), delta)
+                return
+
+            with self._lock:
+                if day != self._day:
+                    return
+                usage = self._empty_usage()
+                for key_id, calls, errors, quota_errors, sidelined_until in rows:
+                    if key_id in usage:
+                        usage[key_id] = {
+                            "calls": calls,
+                            "errors": errors,
+                            "quota_errors": quota_errors,
+                            "sidelined_until": sidelined_until
+                        }
+                # 저장하는 동안 늘어난 사용량 반영
+                for (key_id, pending_day), delta in self._pending.items():
+                    if pending_day == day:
+                        self._merge(usage[key_id], delta)
+                self._usage = usage
+
+    @staticmethod
+    def _key_id(api_key: str) -> str:
+        """API 키 원문 대신 저장/노출에 사용할 식별자"""
+        return hashlib.sha256(api_key.encode()).hexdigest()[:12]
+
+    @staticmethod
+    def _today() -> str:
+        """호출 한도 집계 날짜 (한국 시간 기준)"""
+        return datetime.now(KST).strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _next_reset() -> float:
+        """다음 호출 한도 초기화 시각 (한국 시간 자정)"""
+        tomorrow = datetime.now(KST).date() + timedelta(days=1)
+        return datetime.combine(tomorrow, datetime.min.time(), tzinfo=KST).timestamp()
+
+    @staticmethod
+    def _empty_delta() -> dict:
+        return {"calls": 0, "errors": 0, "quota_errors": 0, "sidelined_until": 0.0}
+
+    @staticmethod
+    def _merge(target: dict, delta: dict):
+        target["calls"] += delta["calls"]
+        target["errors"] += delta["errors"]
+        target["quota_errors"] += delta["quota_errors"]
+        target["sidelined_until"] = max(target["sidelined_until"], delta["sidelined_until"])
+
+    def _empty_usage(self) -> dict:
+        return {key_id: self._empty_delta() for key_id in self._keys}
+
+    def _pending_for(self, key_id: str) -> dict:
+        """오늘 날짜의 저장 대기 증가분 (호출 측에서 잠금 보유)"""
+        return self._pending.setdefault((key_id, self._day), self._empty_delta())
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, timeout=5)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS key_usage (
+                    key_id TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    calls INTEGER NOT NULL,
+                    errors INTEGER NOT NULL,
+                    quota_errors INTEGER NOT NULL,
+                    sidelined_until REAL NOT NULL,
+                    PRIMARY KEY (key_id, day)
+                )
+            """)
+
+    def _roll_day(self):
+        """날짜가 바뀌면 카운터 초기화 (전날 증가분은 다음 저장 때 전날 날짜로 저장, 호출 측에서 잠금 보유)"""
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._usage = self._empty_usage()
+            self._wake.set()
+
+    def _flush_loop(self):
+        while True:
+            self._wake.wait(self.PERSIST_INTERVAL)
+            self._wake.clear()
+            self.flush()
@@ -4,23 +4,51 @@
 """
 
 import os
+import threading
+import time
 import requests
+from collections import OrderedDict
 from typing import Optional
 
+from services.aladin_key_pool import AladinKeyPool
+
 
 class AladinService:
     """알라딘 API를 통한 도서 검색 서비스"""
     
     BASE_URL = "http://www.aladin.co.kr/ttb/api"
     
-    def __init__(self, api_key: Optional[str] = None):
-        self._api_key = api_key or os.getenv("ALADIN_API_KEY")
-        if not self._api_key:
-            raise ValueError("알라딘 API 키가 설정되지 않았습니다.")
+    # 일일 호출 한도 초과 오류 코드
+    QUOTA_ERROR_CODES = {10}
+    
+    def __init__(self, api_key: Optional[str] = None,
+                 cache_ttl: Optional[int] = None,
+                 api_keys: Optional[list] = None,
+                 base_url: Optional[str] = None,
+                 cache_max_entries: Optional[int] = None):
+        # 여러 키를 쓸 때는 ALADIN_API_KEYS에 쉼표로 구분해 설정
+        if api_keys is None:
+            if api_key:
+                api_keys = [api_key]
+            else:
+                api_keys = (os.getenv("ALADIN_API_KEYS") or os.getenv("ALADIN_API_KEY") or "").split(",")
+        self._key_pool = AladinKeyPool(api_keys)
+        self._base_url = base_url or os.getenv("ALADIN_BASE_URL", self.BASE_URL)
+        
+        # 응답 캐시 (LRU 순서): 캐시 키 -> [만료 시각, 응답, 선행 조회 후 아직 사용되지 않았는지]
+        if cache_ttl is None:
+            cache_ttl = int(os.getenv("ALADIN_CACHE_TTL", 3600))
+        self._cache_ttl = cache_ttl
+        self._cache_max_entries = cache_max_entries or int(os.getenv("ALADIN_CACHE_MAX_ENTRIES", 500))
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_stats = {"hits": 0, "misses": 0, "prefetch_hits": 0,
+                             "prefetches": 0, "prefetch_skips": 0}
     
     def search_books(self, query: str, query_type: str = "Keyword", 
                      max_results: int = 10, start: int = 1, 
-                     category_id: Optional[int] = None) -> dict:
+                     category_id: Optional[int] = None,
+                     prefetch: bool = False) -> dict:
         """
         도서 검색
         
@@ -30,12 +58,12 @@ class AladinService:
             max_results: 최대 결과 수 (1-50)
             start: 시작 페이지
             category_id: 카테고리 ID (선택)
+            prefetch: 선행 조회 여부 (캐시를 미리 채울 때 사용)
         
         Returns:
             검색 결과 딕셔너리
         """
         params = {
-            "ttbkey": self._api_key,
             "Query": query,
             "QueryType": query_type,
             "MaxResults": min(max_results, 50),
@@ -49,31 +77,23 @@ class AladinService:
         if category_id:
             params["CategoryId"] = category_id
         
-        try:
-            response = requests.get(
-                f"{self.BASE_URL}/ItemSearch.aspx",
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {"error": str(e), "item": []}
+        return self._request("ItemSearch.aspx", params, prefetch)
     
     def get_bestsellers(self, category_id: int = 0, 
-                        max_results: int = 10) -> dict:
+                        max_results: int = 10,
+                        prefetch: bool = False) -> dict:
         """
         베스트셀러 목록 조회
         
         Args:
             category_id: 카테고리 ID (0: 전체)
             max_results: 최대 결과 수
+            prefetch: 선행 조회 여부 (캐시를 미리 채울 때 사용)
         
         Returns:
             베스트셀러 목록
         """
         params = {
-            "ttbkey": self._api_key,
             "QueryType": "Bestseller",
             "MaxResults": min(max_results, 50),
             "start": 1,
@@ -86,31 +106,23 @@ class AladinService:
         if category_id > 0:
             params["CategoryId"] = category_id
         
-        try:
-            response = requests.get(
-                f"{self.BASE_URL}/ItemList.aspx",
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {"error": str(e), "item": []}
+        return self._request("ItemList.aspx", params, prefetch)
     
     def get_new_releases(self, category_id: int = 0,
-                         max_results: int = 10) -> dict:
+                         max_results: int = 10,
+                         prefetch: bool = False) -> dict:
         """
         신간 도서 목록 조회
         
         Args:
             category_id: 카테고리 ID
             max_results: 최대 결과 수
+            prefetch: 선행 조회 여부 (캐시를 미리 채울 때 사용)
         
         Returns:
             신간 도서 목록
         """
         params = {
-            "ttbkey": self._api_key,
             "QueryType": "ItemNewAll",
             "MaxResults": min(max_results, 50),
             "start": 1,
@@ -123,16 +135,7 @@ class AladinService:
         if category_id > 0:
             params["CategoryId"] = category_id
         
-        try:
-            response = requests.get(
-                f"{self.BASE_URL}/ItemList.aspx",
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {"error": str(e), "item": []}
+        return self._request("ItemList.aspx", params, prefetch)
     
     def get_book_detail(self, item_id: str) -> dict:
         """
@@ -145,7 +148,6 @@ class AladinService:
             도서 상세 정보
         """
         params = {
-            "ttbkey": self._api_key,
             "itemIdType": "ISBN13" if len(item_id) == 13 else "ItemId",
             "ItemId": item_id,
             "output": "js",
@@ -154,16 +156,137 @@ class AladinService:
             "OptResult": "ebookList,usedList,reviewList"
         }
         
-        try:
-            response = requests.get(
-                f"{self.BASE_URL}/ItemLookUp.aspx",
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            return {"error": str(e), "item": []}
+        return self._request("ItemLookUp.aspx", params)
+    
+    def key_stats(self) -> dict:
+        """
+        API 키별 사용량 및 남은 호출 한도 조회
+        
+        Returns:
+            키별 사용량 목록과 전체 남은 호출 한도
+        """
+        keys = self._key_pool.stats()
+        return {
+            "keys": keys,
+            "remaining": sum(key["remaining"] for key in keys if not key["sidelined"]),
+            "persisted": self._key_pool.persisted
+        }
+    
+    def cache_stats(self) -> dict:
+        """
+        응답 캐시 통계 조회
+        
+        Returns:
+            캐시 적중/실패 횟수, 적중률, 선행 조회로 얻은 적중률 향상분(prefetch_lift)
+        """
+        with self._cache_lock:
+            stats = dict(self._cache_stats)
+            stats["size"] = len(self._cache)
+        
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        # 선행 조회가 없었다면 캐시 실패였을 조회의 비율
+        stats["prefetch_lift"] = round(stats["prefetch_hits"] / lookups, 4) if lookups else 0.0
+        return stats
+    
+    def _request(self, endpoint: str, params: dict, prefetch: bool = False) -> dict:
+        """
+        알라딘 API 호출 (응답 캐시 사용)
+        
+        Args:
+            endpoint: API 엔드포인트 (예: ItemSearch.aspx)
+            params: 요청 파라미터
+            prefetch: 선행 조회 여부 (아직 유효한 캐시가 없을 때만 새로 받아 저장)
+        
+        Returns:
+            API 응답 딕셔너리
+        
+        호출마다 남은 한도가 가장 많은 키를 사용하며, 한도 초과나 키 오류를 받으면
+        이번 요청에서 그 키를 빼고 다음 키로 다시 시도합니다.
+        네트워크/서버 오류는 키 문제가 아니므로 키별 오류로 집계하지 않습니다.
+        """
+        cache_key = (endpoint, tuple(sorted(
+            (key, str(value)) for key, value in params.items()
+        )))
+        now = time.time()
+        
+        with self._cache_lock:
+            entry = self._cache.get(cache_key)
+            if entry is not None and entry[0] <= now:
+                del self._cache[cache_key]
+                entry = None
+            
+            if prefetch:
+                # 아직 유효한 항목은 호출 한도를 쓰지 않도록 다시 받지 않음
+                if entry is not None:
+                    self._cache_stats["prefetch_skips"] += 1
+                    return entry[1]
+            elif entry is not None:
+                self._cache.move_to_end(cache_key)
+                self._cache_stats["hits"] += 1
+                if entry[2]:
+                    self._cache_stats["prefetch_hits"] += 1
+                    entry[2] = False
+                return entry[1]
+            else:
+                self._cache_stats["misses"] += 1
+        
+        tried = set()
+        while True:
+            acquired = self._key_pool.acquire(exclude=tried)
+            if acquired is None:
+                return {"error": "사용 가능한 알라딘 API 키가 없습니다. (호출 한도 초과)",
+                        "item": []}
+            key_id, api_key = acquired
+            tried.add(key_id)
+            
+            try:
+                response = requests.get(
+                    f"{self._base_url}/{endpoint}",
+                    params={**params, "ttbkey": api_key},
+                    timeout=10
+                )
+                if response.status_code == 429:
+                    # 일시적 호출 제한: 잠시 제외하고 다른 키로 재시도
+                    self._key_pool.report_error(key_id)
+                    continue
+                response.raise_for_status()
+                result = response.json()
+            except (requests.RequestException, ValueError) as e:
+                return {"error": str(e), "item": []}
+            
+            error_code = result.get("errorCode")
+            if error_code in self.QUOTA_ERROR_CODES:
+                self._key_pool.report_error(key_id, quota_exceeded=True)
+                continue
+            break
+        
+        # 오류 응답은 캐시하지 않음
+        if "errorCode" in result:
+            return result
+        
+        with self._cache_lock:
+            self._cache[cache_key] = [now + self._cache_ttl, result, prefetch]
+            self._cache.move_to_end(cache_key)
+            if prefetch:
+                self._cache_stats["prefetches"] += 1
+            self._evict(now)
+        return result
+    
+    def _evict(self, now: float):
+        """
+        오래 사용되지 않은 쪽부터 캐시 항목 제거 (호출 측에서 잠금을 잡은 상태로 호출)
+        
+        최대 개수를 넘는 만큼과, 맨 앞에서부터 이어지는 만료 항목만 제거해
+        캐시 전체를 훑지 않음
+        """
+        while len(self._cache) > self._cache_max_entries:
+            self._cache.popitem(last=False)
+        while self._cache:
+            oldest_key = next(iter(self._cache))
+            if self._cache[oldest_key][0] > now:
+                break
+            del self._cache[oldest_key]
 
 
 # 카테고리 ID 매핑 (자주 사용되는 카테고리)
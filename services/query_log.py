@@ -0,0 +1,289 @@
+"""
+검색 기록 및 선행 조회 서비스
+사용자 검색 기록을 SQLite에 저장하고, 시간대별 수요를 예측해
+알라딘 캐시를 미리 채우는 기능 제공
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from services.aladin_service import CATEGORY_MAP
+from services.query_service import analyze_query, normalize_query, MOOD_KEYWORDS
+
+
+class QueryLog:
+    """검색 기록 저장소 (기록은 백그라운드 스레드에서 일괄 저장)"""
+
+    BATCH_SIZE = 100
+
+    def __init__(self, db_path: Optional[str] = None):
+        self._db_path = db_path or os.getenv("QUERY_LOG_PATH", "query_log.db")
+        self._queue = queue.Queue(maxsize=10000)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS query_log (
+                    ts REAL NOT NULL,
+                    hour INTEGER NOT NULL,
+                    route TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    max_results INTEGER NOT NULL,
+                    latency_ms REAL NOT NULL,
+                    query_type TEXT NOT NULL DEFAULT 'Keyword'
+                )
+            """)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(query_log)")]
+            if "query_type" not in columns:
+                # 검색 유형 컬럼이 없던 이전 기록 파일
+                conn.execute("ALTER TABLE query_log ADD COLUMN query_type TEXT NOT NULL DEFAULT 'Keyword'")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_query_log_hour_ts ON query_log (hour, ts)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS prefetch_runs (
+                    day TEXT NOT NULL,
+                    hour INTEGER NOT NULL,
+                    pid INTEGER NOT NULL,
+                    ts REAL NOT NULL,
+                    PRIMARY KEY (day, hour)
+                )
+            """)
+
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def record(self, route: str, query: str, category: str = "",
+               max_results: int = 10, query_type: str = "Keyword",
+               latency_ms: float = 0.0):
+        """
+        검색 기록 추가 (요청 처리를 막지 않도록 큐에만 넣음)
+
+        Args:
+            route: API 경로
+            query: 검색어 또는 기분 (라우트가 알라딘 조회에 사용한 값)
+            category: 카테고리 이름
+            max_results: 요청한 결과 수
+            query_type: 검색 유형 (Keyword, Title, Author, Publisher)
+            latency_ms: 응답 시간 (밀리초)
+        """
+        now = time.time()
+        row = (now, datetime.fromtimestamp(now).hour, route, normalize_query(query),
+               category, max_results, round(latency_ms, 1), query_type)
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # 저장이 밀릴 때는 기록을 버려서 요청 처리에 영향을 주지 않음
+            pass
+
+    def flush(self):
+        """대기 중인 기록이 모두 저장될 때까지 대기"""
+        self._queue.join()
+
+    def hourly_volume(self, days: int = 14) -> dict:
+        """
+        시간대별 검색 횟수
+
+        Args:
+            days: 집계 기간 (일)
+
+        Returns:
+            {시간(0-23): 검색 횟수}
+        """
+        since = time.time() - days * 86400
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT hour, COUNT(*) FROM query_log WHERE ts >= ? GROUP BY hour",
+                (since,)
+            ).fetchall()
+        return {hour: count for hour, count in rows}
+
+    def top_queries(self, hour: Optional[int] = None, limit: int = 20,
+                    days: int = 14) -> list:
+        """
+        자주 검색된 검색어 목록
+
+        Args:
+            hour: 시간대 (None이면 전체)
+            limit: 최대 개수
+            days: 집계 기간 (일)
+
+        Returns:
+            검색 횟수 순으로 정렬된 {route, query, query_type, category, max_results, count} 목록
+        """
+        since = time.time() - days * 86400
+        sql = ("SELECT route, query, query_type, category, max_results, COUNT(*) AS cnt "
+               "FROM query_log WHERE ts >= ?")
+        args = [since]
+        if hour is not None:
+            sql += " AND hour = ?"
+            args.append(hour)
+        sql += " GROUP BY route, query, query_type, category, max_results ORDER BY cnt DESC LIMIT ?"
+        args.append(limit)
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, args).fetchall()
+        return [
+            {"route": route, "query": query, "query_type": query_type, "category": category,
+             "max_results": max_results, "count": count}
+            for route, query, query_type, category, max_results, count in rows
+        ]
+
+    def claim_prefetch(self, day: str, hour: int) -> bool:
+        """
+        시간대 선행 조회 담당 선점 (같은 기록 파일을 쓰는 여러 워커 중 한 곳만 선행 조회)
+
+        Args:
+            day: 날짜 (YYYY-MM-DD)
+            hour: 시간대
+
+        Returns:
+            이 프로세스가 선점했으면 True (이미 다른 프로세스가 선점했거나 저장에 실패하면 False)
+        """
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO prefetch_runs (day, hour, pid, ts) VALUES (?, ?, ?, ?)",
+                    (day, hour, os.getpid(), time.time())
+                )
+                return cursor.rowcount == 1
+        except sqlite3.Error:
+            # 선점 여부를 알 수 없으면 호출 한도를 아끼기 위해 건너뜀
+            return False
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, timeout=5)
+
+    def _write_loop(self):
+        """큐에 쌓인 기록을 모아서 저장 (전용 스레드)"""
+        conn = self._connect()
+        while True:
+            rows = [self._queue.get()]
+            while len(rows) < self.BATCH_SIZE:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO query_log (ts, hour, route, query, category, max_results, "
+                        "latency_ms, query_type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+                    )
+            except sqlite3.Error:
+                pass
+            finally:
+                for _ in rows:
+                    self._queue.task_done()
+
+
+class PrefetchScheduler:
+    """
+    검색 기록 기반으로 수요가 몰리는 시간대 직전에 알라딘 캐시를 미리 채우는 스케줄러
+
+    워커마다 스케줄러가 돌더라도 시간대별 선행 조회는 검색 기록 파일에서
+    먼저 선점한 한 프로세스만 실행하며, 채워진 캐시는 그 프로세스에만 있음
+    """
+
+    def __init__(self, aladin, query_log: QueryLog, top_n: Optional[int] = None,
+                 lead_minutes: Optional[int] = None, interval: int = 60):
+        self._aladin = aladin
+        self._query_log = query_log
+        self._top_n = top_n or int(os.getenv("PREFETCH_TOP_N", 20))
+        self._lead = timedelta(minutes=lead_minutes or int(os.getenv("PREFETCH_LEAD_MINUTES", 10)))
+        self._interval = interval
+        self._warmed = set()
+        self.last_run = {}
+        self._thread = None
+
+    def start(self):
+        """백그라운드 스케줄러 시작"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run_loop, daemon=True)
+            self._thread.start()
+
+    def predicted_peaks(self) -> list:
+        """평균 이상의 검색량을 보인 시간대 목록 (예: 수업 교대 시간)"""
+        volume = self._query_log.hourly_volume()
+        if not volume:
+            return []
+        average = sum(volume.values()) / len(volume)
+        return sorted(hour for hour, count in volume.items() if count >= average)
+
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """
+        다가오는 시간대가 예측된 피크라면 해당 시간대의 인기 검색을 미리 조회
+
+        Args:
+            now: 기준 시각 (기본값: 현재 시각)
+
+        Returns:
+            선행 조회한 요청 수
+        """
+        target = (now or datetime.now()) + self._lead
+        slot = (target.date(), target.hour)
+        if slot in self._warmed:
+            return 0
+        self._warmed.add(slot)
+
+        if target.hour not in self.predicted_peaks():
+            return 0
+        if not self._query_log.claim_prefetch(target.strftime("%Y-%m-%d"), target.hour):
+            return 0
+
+        warmed = 0
+        for entry in self._query_log.top_queries(hour=target.hour, limit=self._top_n):
+            if self._warm(entry):
+                warmed += 1
+
+        self.last_run = {
+            "hour": target.hour,
+            "warmed": warmed,
+            "at": datetime.now().isoformat(timespec="seconds")
+        }
+        return warmed
+
+    def _warm(self, entry: dict) -> bool:
+        """기록된 요청이 실제로 호출하는 알라딘 조회를 그대로 재현"""
+        route = entry["route"]
+        query = entry["query"]
+        category_id = CATEGORY_MAP.get(entry["category"], 0)
+        max_results = entry["max_results"]
+
+        if route == "/api/search" and query:
+            self._aladin.search_books(query, entry["query_type"], max_results, prefetch=True)
+        elif route == "/api/bestsellers":
+            self._aladin.get_bestsellers(category_id, max_results, prefetch=True)
+        elif route == "/api/new-releases":
+            self._aladin.get_new_releases(category_id, max_results, prefetch=True)
+        elif route == "/api/recommend" and query:
+            self._aladin.search_books(query, "Keyword", max_results, category_id=category_id,
+                                      prefetch=True)
+        elif route == "/api/recommend/mood" and query:
+            self._aladin.search_books(MOOD_KEYWORDS.get(query, query), "Keyword", max_results,
+                                      prefetch=True)
+        elif route == "/api/recommend/chat" and query:
+            # 첫 번째 검색어 후보 (후보가 없으면 라우트처럼 카테고리 베스트셀러)
+            analysis = analyze_query(query)
+            if analysis["queries"]:
+                candidate = analysis["queries"][0]
+                self._aladin.search_books(candidate["query"], "Keyword", max_results,
+                                          category_id=candidate["category_id"], prefetch=True)
+            else:
+                self._aladin.get_bestsellers(analysis["category_id"], max_results=max_results,
+                                             prefetch=True)
+        else:
+            return False
+        return True
+
+    def _run_loop(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception:
+                pass
+            time.sleep(self._interval)
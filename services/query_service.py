@@ -0,0 +1,298 @@
+"""
+질문 분석 서비스
+자유 질문을 알라딘 검색에 적합한 검색어로 변환하는 기능 제공
+"""
+
+import re
+from typing import Optional
+
+from services.aladin_service import CATEGORY_MAP
+
+
+# 기분별 검색 키워드
+MOOD_KEYWORDS = {
+    "힐링": "에세이 위로",
+    "설렘": "도전 성공",
+    "우울": "희망 치유",
+    "호기심": "과학 철학",
+    "지침": "여행 휴식",
+    "성장": "자기계발 성장"
+}
+
+# 질문 속 표현 → 기분 (어간 기준, 활용형은 앞부분 일치로 판별)
+MOOD_TRIGGERS = {
+    "힐링": "힐링",
+    "위로": "힐링",
+    "외로": "힐링",
+    "불안": "힐링",
+    "설레": "설렘",
+    "설렘": "설렘",
+    "도전": "설렘",
+    "우울": "우울",
+    "슬퍼": "우울",
+    "슬프": "우울",
+    "힘들": "우울",
+    "궁금": "호기심",
+    "호기심": "호기심",
+    "지쳐": "지침",
+    "지치": "지침",
+    "지침": "지침",
+    "피곤": "지침",
+    "가볍": "지침",
+    "가벼": "지침",
+    "쉬고": "지침",
+    "성장": "성장",
+    "발전": "성장",
+    "동기부여": "성장",
+}
+
+# 기분을 나타내면서 그 자체로 주제가 되는 단어 (검색어에도 남김)
+TOPIC_MOOD_WORDS = {"힐링", "위로", "불안", "도전", "성장", "발전", "동기부여", "호기심"}
+
+# 질문 속 표현 → CATEGORY_MAP 카테고리
+CATEGORY_TRIGGERS = {
+    "소설": "소설/시/희곡",
+    "시집": "소설/시/희곡",
+    "희곡": "소설/시/희곡",
+    "경제": "경제경영",
+    "경제학": "경제경영",
+    "경영": "경제경영",
+    "투자": "경제경영",
+    "주식": "경제경영",
+    "재테크": "경제경영",
+    "마케팅": "경제경영",
+    "자기계발": "자기계발",
+    "인문": "인문학",
+    "철학": "인문학",
+    "심리": "인문학",
+    "심리학": "인문학",
+    "인문학": "인문학",
+    "역사": "역사",
+    "사회": "사회과학",
+    "사회학": "사회과학",
+    "정치": "사회과학",
+    "과학": "과학",
+    "물리": "과학",
+    "수학": "과학",
+    "컴퓨터": "컴퓨터/IT",
+    "프로그래밍": "컴퓨터/IT",
+    "코딩": "컴퓨터/IT",
+    "개발": "컴퓨터/IT",
+    "파이썬": "컴퓨터/IT",
+    "인공지능": "컴퓨터/IT",
+    "예술": "예술/대중문화",
+    "미술": "예술/대중문화",
+    "음악": "예술/대중문화",
+    "영화": "예술/대중문화",
+    "영어": "외국어",
+    "일본어": "외국어",
+    "중국어": "외국어",
+    "외국어": "외국어",
+    "교재": "대학교재",
+    "전공": "대학교재",
+    "자격증": "수험서/자격증",
+    "시험": "수험서/자격증",
+    "토익": "수험서/자격증",
+    "운동": "취미/건강",
+    "건강": "취미/건강",
+    "취미": "취미/건강",
+    "여행": "여행",
+    "요리": "요리",
+}
+
+# 검색에 도움이 되지 않는 단어
+STOPWORDS = {
+    "책", "도서", "추천", "추천해", "추천해줘", "추천해주세요", "알려줘", "알려주세요",
+    "있을까요", "있나요", "있어요", "없을까요", "좋은", "좋을", "괜찮은", "읽을",
+    "읽을만한", "읽기", "볼", "볼만한", "만한", "요즘", "너무", "정말", "진짜", "좀",
+    "조금", "그냥", "어떤", "무슨", "뭐", "뭔가", "같은", "저", "제가", "나", "내가",
+    "우리", "학생", "대학생", "싶어요", "싶은데", "싶다", "하는", "하고", "관련",
+    "관한", "대한", "위한", "주세요", "해주세요", "수", "것", "거", "때", "처음",
+    "관심", "분야", "종류", "정도", "느낌", "권", "몇", "사람", "사람들", "대해",
+    "대해서", "법", "방법", "할", "갈", "될",
+}
+
+# 용언 어미처럼 끝나지만 명사인 단어와, 검색어로 쓸 만한 한 글자 명사
+KNOWN_NOUNS = {
+    "바다", "광고", "최고", "창고", "라면", "가게", "화면", "장면", "측면", "사고",
+    "회고", "참고", "재고", "원고", "고고", "평면", "내면", "이면", "다이어트",
+    "스타트업", "데이터", "리더십", "에세이", "만화", "웹툰", "고양이",
+    "강아지", "우주", "사랑", "연애", "인간관계", "대화", "글쓰기", "독서", "공부",
+    "시", "꿈", "돈", "별", "몸", "삶", "술", "집", "꽃", "뇌",
+}
+
+# 체언 뒤 조사 (긴 것부터 제거)
+PARTICLES = sorted([
+    "에서는", "으로는", "에게는", "이라도", "까지는", "에서", "으로", "에게", "한테",
+    "처럼", "만큼", "보다", "까지", "부터", "이나", "이랑", "하고", "에는", "은",
+    "는", "이", "가", "을", "를", "에", "의", "도", "로", "와", "과", "만", "랑", "나",
+], key=len, reverse=True)
+
+# 받침 있는 글자 뒤에만 붙는 조사 / 받침 없는 글자 뒤에만 붙는 조사
+# ("전문가", "소설가"의 "가"는 받침 뒤라 조사가 아님)
+PARTICLES_AFTER_CONSONANT = {"이", "은", "을", "과", "으로", "으로는", "이나", "이랑", "이라도"}
+PARTICLES_AFTER_VOWEL = {"가", "는", "를", "와", "로", "나", "랑"}
+
+# 명사 끝 글자와도 같아 알려진 명사나 불용어 뒤에서만 조사로 보는 것
+# ("어린이", "원숭이"의 "이", "가는"처럼 용언의 "는/은")
+AMBIGUOUS_PARTICLES = {"이", "은", "는"}
+
+# 용언 활용 어미 (명사로 알려지지 않은 단어가 이 어미로 끝나면 검색어에서 제외)
+VERB_ENDINGS = (
+    "요", "까", "니다", "는데", "어서", "아서", "해서", "워서", "쳐서", "고", "게",
+    "면", "다", "죠", "네", "하는", "되는", "있는", "없는", "하던", "했던", "싶은",
+    "할", "하려는", "는", "은",
+)
+
+_PUNCT_PATTERN = re.compile(r"[^\w\s]")
+
+
+def normalize_query(query: str) -> str:
+    """검색어 정규화 (앞뒤 공백 제거, 연속 공백 축약)"""
+    return " ".join(query.split())
+
+
+def _has_final_consonant(syllable: str) -> Optional[bool]:
+    """한글 음절의 받침 여부 (한글이 아니면 None)"""
+    code = ord(syllable) - 0xAC00
+    if not 0 <= code < 11172:
+        return None
+    return code % 28 != 0
+
+
+def _particle_fits(word: str, particle: str) -> bool:
+    """앞 글자의 받침으로 보아 조사가 붙을 수 있는 자리인지 확인"""
+    final = _has_final_consonant(word[-1])
+    if final is None:
+        return True
+    if particle in PARTICLES_AFTER_CONSONANT:
+        return final
+    if particle in PARTICLES_AFTER_VOWEL:
+        # "로"는 ㄹ 받침 뒤에도 붙음 ("서울로")
+        return not final or (particle == "로" and (ord(word[-1]) - 0xAC00) % 28 == 8)
+    return True
+
+
+def _strip_particle(token: str) -> str:
+    """단어 끝의 조사 제거 (받침이 맞지 않거나, 애매한 조사 앞이 알려진 명사가 아니면 그대로 둠)"""
+    if _is_noun(token):
+        return token
+    for particle in PARTICLES:
+        if not token.endswith(particle) or len(token) == len(particle):
+            continue
+        word = token[:-len(particle)]
+        if not _particle_fits(word, particle):
+            continue
+        if particle in AMBIGUOUS_PARTICLES and not (_is_noun(word) or word in STOPWORDS):
+            continue
+        return word
+    return token
+
+
+def _is_noun(word: str) -> bool:
+    """명사로 알려진 단어인지 확인 ("운동하는"처럼 명사로 시작하는 용언은 제외)"""
+    return word in KNOWN_NOUNS or word in TOPIC_MOOD_WORDS or word in CATEGORY_TRIGGERS
+
+
+def _match_trigger(token: str, triggers: dict) -> Optional[str]:
+    """단어가 트리거 표현으로 시작하면 매핑된 값 반환"""
+    for stem, value in triggers.items():
+        if token.startswith(stem):
+            return value
+    return None
+
+
+def analyze_query(query: str) -> dict:
+    """
+    자유 질문을 분석하여 검색어 생성
+
+    Args:
+        query: 사용자 자유 질문
+
+    Returns:
+        분석 결과 딕셔너리
+        (keywords, mood, category, category_id, queries)
+        queries는 {"query", "category_id"} 검색어 하나를 담은 목록이며,
+        검색할 만한 단어가 없으면 빈 목록 (바로 베스트셀러로 대체)
+    """
+    tokens = _PUNCT_PATTERN.sub(" ", query).split()
+
+    keywords = []
+    mood = None
+    category = None
+
+    for token in tokens:
+        if token in STOPWORDS:
+            continue
+        word = _strip_particle(token)
+
+        token_mood = _match_trigger(token, MOOD_TRIGGERS)
+        if token_mood:
+            mood = mood or token_mood
+            if word not in TOPIC_MOOD_WORDS:
+                continue
+
+        if word.endswith("책") and len(word) > 2:
+            # "과학책" -> "과학"
+            word = word[:-1]
+        if word in STOPWORDS:
+            continue
+
+        # 카테고리는 조사를 뗀 단어 전체가 일치할 때만 ("사회초년생"이 사회과학이 되지 않도록)
+        category = category or CATEGORY_TRIGGERS.get(word)
+
+        if _is_noun(word):
+            pass
+        elif len(word) == 1:
+            # "길에" -> "길"처럼 알려지지 않은 한 글자 단어는 검색어로 쓰지 않음
+            continue
+        elif word == token and token.endswith(VERB_ENDINGS):
+            # 조사를 떼지 못한 단어의 어미 판별 ("좋아하는", "가는", "건강하게")
+            continue
+        elif word != token and word.endswith(VERB_ENDINGS):
+            continue
+
+        if word not in keywords:
+            keywords.append(word)
+
+    category_id = CATEGORY_MAP.get(category, 0) if category else 0
+
+    # 검색은 한 번만 (검색 + 베스트셀러 대체가 기존처럼 최대 2회가 되도록)
+    queries = []
+    if keywords:
+        queries.append({"query": " ".join(keywords[:3]), "category_id": category_id})
+    elif mood:
+        queries.append({"query": MOOD_KEYWORDS[mood], "category_id": 0})
+
+    return {
+        "keywords": keywords,
+        "mood": mood,
+        "category": category,
+        "category_id": category_id,
+        "queries": queries
+    }
+
+
+def search_books_for_question(aladin, question: str, max_results: int = 15) -> list:
+    """
+    자유 질문으로 도서 검색
+
+    Args:
+        aladin: AladinService 인스턴스
+        question: 사용자 자유 질문
+        max_results: 최대 결과 수
+
+    Returns:
+        도서 목록 (검색 결과가 없으면 질문의 카테고리 베스트셀러로 대체,
+        알라딘 호출은 최대 2회)
+    """
+    analysis = analyze_query(question)
+    for candidate in analysis["queries"]:
+        search_result = aladin.search_books(candidate["query"], "Keyword", max_results,
+                                            category_id=candidate["category_id"])
+        books = search_result.get("item", [])
+        if books:
+            return books
+
+    bestseller_result = aladin.get_bestsellers(analysis["category_id"], max_results=max_results)
+    return bestseller_result.get("item", [])
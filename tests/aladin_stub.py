@@ -0,0 +1,54 @@
+"""
+알라딘 API 대역 (requests.get 대체)
+키별 일일 호출 한도를 적용하고, 호출 기록을 남김
+"""
+
+import requests
+
+
+class FakeResponse:
+    def __init__(self, body: dict, status_code: int = 200):
+        self._body = body
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error")
+
+    def json(self):
+        return self._body
+
+
+class FakeAladinAPI:
+    """
+    키마다 호출 한도를 두고, 한도를 넘으면 알라딘과 같은 errorCode 10 응답을 돌려주는 대역
+
+    Args:
+        quota: 키별 호출 한도
+        error_keys: 항상 해당 errorCode를 돌려줄 키 {키: errorCode}
+        throttled_keys: 항상 HTTP 429를 돌려줄 키
+        offline: True면 연결 오류 발생
+    """
+
+    def __init__(self, quota: int = 1000, error_keys: dict = None, throttled_keys=(),
+                 offline: bool = False):
+        self.quota = quota
+        self.error_keys = error_keys or {}
+        self.throttled_keys = set(throttled_keys)
+        self.offline = offline
+        self.calls = []
+        self.used = {}
+
+    def get(self, url: str, params: dict, timeout: int = 10) -> FakeResponse:
+        if self.offline:
+            raise requests.ConnectionError("connection refused")
+        key = params["ttbkey"]
+        self.calls.append((url, dict(params)))
+        self.used[key] = self.used.get(key, 0) + 1
+        if key in self.throttled_keys:
+            return FakeResponse({}, status_code=429)
+        if key in self.error_keys:
+            return FakeResponse({"errorCode": self.error_keys[key], "errorMessage": "알라딘 오류"})
+        if self.used[key] > self.quota:
+            return FakeResponse({"errorCode": 10, "errorMessage": "1일 호출 한도를 초과했습니다."})
+        return FakeResponse({"item": [{"title": params.get("Query", params.get("QueryType"))}]})
@@ -0,0 +1,96 @@
+"""
+자유 질문 검색 측정 도구
+기록된 질문 목록으로 /api/recommend/chat의 알라딘 호출 수, 빈 검색 수,
+베스트셀러 대체 횟수를 기존 방식(질문 전체를 검색어로 사용)과 비교
+
+실행: python -m tests.chat_query_harness
+"""
+
+import json
+import os
+
+from services.query_service import search_books_for_question
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+def load_json(name: str):
+    with open(os.path.join(DATA_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class StubAladin:
+    """
+    알라딘 API 대역
+    검색어의 모든 단어가 제목/소개에 포함된 도서만 돌려주는 키워드 검색을 흉내 내고 호출 수를 집계
+    """
+
+    def __init__(self, catalogue: list):
+        self._catalogue = catalogue
+        self.calls = 0
+        self.empty_searches = 0
+        self.fallbacks = 0
+
+    def search_books(self, query: str, query_type: str = "Keyword",
+                     max_results: int = 10, start: int = 1,
+                     category_id=None, prefetch: bool = False) -> dict:
+        self.calls += 1
+        terms = query.split()
+        items = [
+            book for book in self._catalogue
+            if all(term in f"{book['title']} {book['description']}" for term in terms)
+            and (not category_id or book["categoryId"] == category_id)
+        ]
+        if not items:
+            self.empty_searches += 1
+        return {"item": items[:max_results]}
+
+    def get_bestsellers(self, category_id: int = 0, max_results: int = 10,
+                        prefetch: bool = False) -> dict:
+        self.calls += 1
+        self.fallbacks += 1
+        items = [book for book in self._catalogue
+                 if not category_id or book["categoryId"] == category_id]
+        return {"item": items[:max_results]}
+
+
+def baseline_search(aladin, question: str, max_results: int = 15) -> list:
+    """기존 방식: 질문 전체로 검색하고, 결과가 없으면 전체 베스트셀러로 대체"""
+    books = aladin.search_books(question, "Keyword", max_results).get("item", [])
+    if not books:
+        books = aladin.get_bestsellers(max_results=max_results).get("item", [])
+    return books
+
+
+def measure(search_fn, questions: list, catalogue: list) -> dict:
+    """질문 목록 전체에 대해 검색 함수를 실행하고 알라딘 호출 통계를 반환"""
+    aladin = StubAladin(catalogue)
+    max_calls = 0
+    for question in questions:
+        calls_before = aladin.calls
+        search_fn(aladin, question)
+        max_calls = max(max_calls, aladin.calls - calls_before)
+    return {
+        "questions": len(questions),
+        "calls": aladin.calls,
+        "empty_searches": aladin.empty_searches,
+        "fallbacks": aladin.fallbacks,
+        "max_calls": max_calls,
+    }
+
+
+def main():
+    questions = load_json("chat_queries.json")
+    catalogue = load_json("aladin_catalogue.json")
+
+    baseline = measure(baseline_search, questions, catalogue)
+    rewritten = measure(search_books_for_question, questions, catalogue)
+
+    print(f"{'':16}{'기존':>8}{'질문 분석':>10}")
+    print(f"{'questions':16}{baseline['questions']:>8}{rewritten['questions']:>10}")
+    for key in ("calls", "empty_searches", "fallbacks", "max_calls"):
+        print(f"{key:16}{baseline[key]:>8}{rewritten[key]:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_storage(tmp_path, monkeypatch):
+    """서비스가 만드는 SQLite 파일을 테스트마다 임시 폴더에 생성"""
+    monkeypatch.setenv("ALADIN_KEY_USAGE_PATH", str(tmp_path / "aladin_key_usage.db"))
+    monkeypatch.setenv("QUERY_LOG_PATH", str(tmp_path / "query_log.db"))
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+from services.aladin_key_pool import KST, AladinKeyPool
+
+
+def test_unwritable_storage_falls_back_to_memory():
+    pool = AladinKeyPool(["k1"], db_path="/nonexistent/dir/k.db")
+
+    assert not pool.persisted
+    assert pool.acquire() is not None
+    assert pool.stats()[0]["calls"] == 1
+
+
+def test_counts_from_processes_sharing_storage_are_added(tmp_path):
+    db_path = str(tmp_path / "usage.db")
+    first = AladinKeyPool(["k1"], db_path=db_path)
+    second = AladinKeyPool(["k1"], db_path=db_path)
+
+    for _ in range(3):
+        first.acquire()
+    for _ in range(2):
+        second.acquire()
+    first.flush()
+    second.flush()
+    first.flush()
+
+    assert first.stats()[0]["calls"] == 5
+    assert second.stats()[0]["calls"] == 5
+
+
+def test_shared_budget_limits_every_process(tmp_path):
+    db_path = str(tmp_path / "usage.db")
+    first = AladinKeyPool(["k1"], daily_budget=4, db_path=db_path)
+    second = AladinKeyPool(["k1"], daily_budget=4, db_path=db_path)
+
+    for _ in range(3):
+        assert first.acquire() is not None
+    first.flush()
+    second.flush()
+
+    assert second.acquire() is not None
+    assert second.acquire() is None
+
+
+def test_usage_survives_restart(tmp_path):
+    db_path = str(tmp_path / "usage.db")
+    pool = AladinKeyPool(["k1", "k2"], db_path=db_path)
+    key_id, _ = pool.acquire()
+    pool.report_error(key_id, quota_exceeded=True)
+    pool.flush()
+
+    restarted = AladinKeyPool(["k1", "k2"], db_path=db_path)
+    stats = {key["key_id"]: key for key in restarted.stats()}
+    assert stats[key_id]["calls"] == 1
+    assert stats[key_id]["sidelined"]
+
+
+def test_quota_reset_is_next_midnight_in_seoul():
+    reset = datetime.fromtimestamp(AladinKeyPool._next_reset(), KST)
+
+    assert (reset.hour, reset.minute) == (0, 0)
+    assert reset.date() == datetime.now(KST).date() + timedelta(days=1)
+    assert AladinKeyPool._today() == datetime.now(KST).strftime("%Y-%m-%d")
@@ -0,0 +1,139 @@
+import time
+
+import pytest
+import requests
+
+from services.aladin_service import AladinService
+from tests.aladin_stub import FakeAladinAPI
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    """옵션을 받아 FakeAladinAPI를 만들고 requests.get을 대체하는 팩토리"""
+    def make(**kwargs):
+        fake = FakeAladinAPI(**kwargs)
+        monkeypatch.setattr(requests, "get", fake.get)
+        return fake
+    return make
+
+
+def test_cached_response_is_reused(fake_api):
+    api = fake_api()
+    aladin = AladinService(api_key="k1")
+    aladin.search_books("파이썬")
+    aladin.search_books("파이썬")
+
+    assert len(api.calls) == 1
+    assert aladin.cache_stats()["hits"] == 1
+
+
+def test_prefetch_skips_entries_that_are_still_cached(fake_api):
+    api = fake_api()
+    aladin = AladinService(api_key="k1")
+    aladin.search_books("파이썬")
+    aladin.search_books("파이썬", prefetch=True)
+
+    assert len(api.calls) == 1
+    assert aladin.cache_stats()["prefetch_skips"] == 1
+
+
+def test_prefetched_entry_counts_as_lift(fake_api):
+    api = fake_api()
+    aladin = AladinService(api_key="k1")
+    aladin.get_bestsellers(336, 12, prefetch=True)
+    aladin.get_bestsellers(336, 12)
+    aladin.get_bestsellers(336, 12)
+
+    stats = aladin.cache_stats()
+    assert len(api.calls) == 1
+    assert stats["prefetch_hits"] == 1
+    assert stats["prefetch_lift"] == 0.5
+
+
+def test_cache_evicts_least_recently_used_entry(fake_api):
+    api = fake_api()
+    aladin = AladinService(api_key="k1", cache_max_entries=2)
+    aladin.search_books("a")
+    aladin.search_books("b")
+    aladin.search_books("a")
+    aladin.search_books("c")
+
+    assert aladin.cache_stats()["size"] == 2
+    aladin.search_books("a")
+    assert len(api.calls) == 3
+    aladin.search_books("b")
+    assert len(api.calls) == 4
+
+
+def test_calls_are_spread_by_remaining_budget(fake_api):
+    api = fake_api()
+    aladin = AladinService(api_keys=["k1", "k2", "k3"])
+    for i in range(30):
+        aladin.search_books(f"q{i}")
+
+    assert api.used == {"k1": 10, "k2": 10, "k3": 10}
+
+
+def test_quota_error_sidelines_key_and_fails_over(fake_api):
+    api = fake_api(quota=2)
+    aladin = AladinService(api_keys=["k1", "k2"])
+    results = [aladin.search_books(f"q{i}") for i in range(4)]
+    assert all(result["item"] for result in results)
+
+    # 두 키 모두 한도를 넘기면 한도 초과 응답을 받은 뒤 제외됨
+    result = aladin.search_books("q4")
+    assert "error" in result
+    stats = aladin.key_stats()
+    assert all(key["sidelined"] for key in stats["keys"])
+    assert stats["remaining"] == 0
+
+
+def test_all_keys_exhausted_returns_error_without_calling(fake_api):
+    api = fake_api(quota=1)
+    aladin = AladinService(api_keys=["k1"])
+    aladin.search_books("q0")
+    aladin.search_books("q1")
+    calls = len(api.calls)
+
+    result = aladin.search_books("q2")
+    assert result["item"] == []
+    assert "error" in result
+    assert len(api.calls) == calls
+
+
+def test_http_429_sidelines_key_briefly(fake_api):
+    api = fake_api(throttled_keys=["k1"])
+    aladin = AladinService(api_keys=["k1", "k2"])
+    for i in range(5):
+        assert aladin.search_books(f"q{i}")["item"]
+
+    assert api.used["k1"] == 1
+    stats = {key["errors"]: key for key in aladin.key_stats()["keys"]}
+    # 일시적 호출 제한은 일일 한도 초과로 보지 않고 잠시만 제외
+    assert stats[1]["sidelined"] and stats[1]["quota_errors"] == 0
+    assert not stats[0]["sidelined"]
+
+    pool = aladin._key_pool
+    throttled = [usage for usage in pool._usage.values() if usage["errors"]][0]
+    assert throttled["sidelined_until"] <= time.time() + pool.THROTTLE_SIDELINE_SECONDS
+
+
+def test_other_error_codes_are_returned_without_failover(fake_api):
+    api = fake_api(error_keys={"k1": 8})
+    aladin = AladinService(api_keys=["k1", "k2"])
+    result = aladin.search_books("q0")
+
+    assert result["errorCode"] == 8
+    assert len(api.calls) == 1
+    assert not any(key["sidelined"] for key in aladin.key_stats()["keys"])
+
+
+def test_network_errors_do_not_count_against_key(fake_api):
+    fake_api(offline=True)
+    aladin = AladinService(api_keys=["k1"])
+    for i in range(10):
+        assert "error" in aladin.search_books(f"q{i}")
+
+    key = aladin.key_stats()["keys"][0]
+    assert key["errors"] == 0
+    assert not key["sidelined"]
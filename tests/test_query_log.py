@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from services.query_log import QueryLog, PrefetchScheduler
+
+
+class RecordingAladin:
+    def __init__(self):
+        self.calls = []
+
+    def search_books(self, *args, **kwargs):
+        self.calls.append(("search_books", args, kwargs))
+
+    def get_bestsellers(self, *args, **kwargs):
+        self.calls.append(("get_bestsellers", args, kwargs))
+
+    def get_new_releases(self, *args, **kwargs):
+        self.calls.append(("get_new_releases", args, kwargs))
+
+
+def test_top_queries_keep_query_type():
+    query_log = QueryLog()
+    for _ in range(3):
+        query_log.record("/api/search", " 한강 ", max_results=12, query_type="Author")
+    query_log.record("/api/search", "한강", max_results=12)
+    query_log.flush()
+
+    top = query_log.top_queries(hour=datetime.now().hour)
+    assert top[0]["query"] == "한강"
+    assert top[0]["query_type"] == "Author"
+    assert top[0]["count"] == 3
+
+
+def test_prefetch_replays_logged_parameters():
+    query_log = QueryLog()
+    query_log.record("/api/search", "한강", max_results=12, query_type="Author")
+    query_log.record("/api/bestsellers", "", category="자기계발", max_results=12)
+    query_log.flush()
+
+    aladin = RecordingAladin()
+    scheduler = PrefetchScheduler(aladin, query_log, lead_minutes=1)
+    warmed = scheduler.run_once(datetime.now().replace(minute=0))
+
+    assert warmed == 2
+    assert ("search_books", ("한강", "Author", 12), {"prefetch": True}) in aladin.calls
+    assert ("get_bestsellers", (336, 12), {"prefetch": True}) in aladin.calls
+
+
+def test_prefetch_runs_in_one_process_per_slot():
+    first = QueryLog()
+    first.record("/api/search", "한강", max_results=12)
+    first.flush()
+    # 같은 기록 파일을 쓰는 다른 워커
+    second = QueryLog()
+
+    now = datetime.now().replace(minute=0)
+    first_aladin, second_aladin = RecordingAladin(), RecordingAladin()
+    assert PrefetchScheduler(first_aladin, first, lead_minutes=1).run_once(now) == 1
+    assert PrefetchScheduler(second_aladin, second, lead_minutes=1).run_once(now) == 0
+    assert second_aladin.calls == []
+
+
+def test_prefetch_translates_chat_and_mood_queries():
+    query_log = QueryLog()
+    query_log.record("/api/recommend/chat", "파이썬 프로그래밍을 처음 배우는데 좋은 책 추천해주세요",
+                     max_results=15)
+    query_log.record("/api/recommend/chat", "책 추천해줘", max_results=15)
+    query_log.record("/api/recommend/mood", "힐링", max_results=15)
+    query_log.flush()
+
+    aladin = RecordingAladin()
+    scheduler = PrefetchScheduler(aladin, query_log, lead_minutes=1)
+    warmed = scheduler.run_once(datetime.now().replace(minute=0))
+
+    assert warmed == 3
+    assert ("search_books", ("파이썬 프로그래밍", "Keyword", 15),
+            {"category_id": 351, "prefetch": True}) in aladin.calls
+    # 검색어가 없는 질문은 라우트처럼 베스트셀러로 대체
+    assert ("get_bestsellers", (0,), {"max_results": 15, "prefetch": True}) in aladin.calls
+    assert ("search_books", ("에세이 위로", "Keyword", 15), {"prefetch": True}) in aladin.calls
@@ -0,0 +1,77 @@
+from services.query_service import analyze_query, search_books_for_question
+from tests.chat_query_harness import StubAladin, baseline_search, load_json, measure
+
+
+def queries(question):
+    return [candidate["query"] for candidate in analyze_query(question)["queries"]]
+
+
+def test_nouns_with_verb_like_endings_are_kept():
+    assert analyze_query("바다 관련 소설")["keywords"] == ["바다", "소설"]
+    assert analyze_query("광고 마케팅 책")["keywords"] == ["광고", "마케팅"]
+    assert "라면" in analyze_query("라면 요리 책")["keywords"]
+
+
+def test_adnominal_verbs_are_dropped():
+    assert queries("고양이를 좋아하는 사람을 위한 책") == ["고양이"]
+
+
+def test_topic_mood_word_stays_in_query():
+    result = analyze_query("도전 정신에 관한 책")
+    assert result["mood"] == "설렘"
+    assert queries("도전 정신에 관한 책")[0] == "도전 정신"
+
+
+def test_mood_only_question_uses_mood_keywords():
+    result = analyze_query("요즘 너무 지쳐서 가볍게 읽을 책 있을까요?")
+    assert result["mood"] == "지침"
+    assert queries("요즘 너무 지쳐서 가볍게 읽을 책 있을까요?") == ["여행 휴식"]
+
+
+def test_category_is_detected():
+    result = analyze_query("파이썬 프로그래밍을 처음 배우는데 좋은 책 추천해주세요")
+    assert result["category"] == "컴퓨터/IT"
+    assert queries("파이썬 프로그래밍을 처음 배우는데 좋은 책 추천해주세요")[0] == "파이썬 프로그래밍"
+
+
+def test_category_needs_whole_word_match():
+    assert analyze_query("사회초년생 재테크 책")["category"] == "경제경영"
+    assert analyze_query("개발도상국 경제")["category"] == "경제경영"
+    assert analyze_query("수학여행 가는 길에 읽을 책")["category"] is None
+    assert analyze_query("시험관 아기")["category"] is None
+
+
+def test_nouns_ending_like_particles_are_kept():
+    assert queries("어린이 동화") == ["어린이 동화"]
+    assert queries("원숭이 그림책") == ["원숭이 그림"]
+    assert queries("전문가가 쓴 투자 책") == ["전문가 투자"]
+    assert queries("수학여행 가는 길에 읽을 책") == ["수학여행"]
+
+
+def test_question_without_keywords_goes_straight_to_bestsellers():
+    aladin = StubAladin(load_json("aladin_catalogue.json"))
+    books = search_books_for_question(aladin, "책 추천해줘")
+    assert books
+    assert aladin.calls == 1
+    assert aladin.fallbacks == 1
+
+
+def test_each_question_makes_at_most_two_aladin_calls():
+    for question in ("우울할 때 읽을 고래 이야기", "요즘 너무 지쳐서 가볍게 읽을 책 있을까요?",
+                     "파이썬 프로그래밍을 처음 배우는데 좋은 책 추천해주세요", "책 추천해줘"):
+        aladin = StubAladin([])
+        search_books_for_question(aladin, question)
+        assert aladin.calls <= 2
+
+
+def test_recorded_queries_need_fewer_aladin_calls_than_baseline():
+    questions = load_json("chat_queries.json")
+    catalogue = load_json("aladin_catalogue.json")
+
+    baseline = measure(baseline_search, questions, catalogue)
+    rewritten = measure(search_books_for_question, questions, catalogue)
+
+    assert rewritten["calls"] < baseline["calls"]
+    assert rewritten["empty_searches"] < baseline["empty_searches"]
+    assert rewritten["fallbacks"] < baseline["fallbacks"]
+    assert rewritten["max_calls"] <= baseline["max_calls"]